@@ -4,23 +4,107 @@ junctionrelay_python.py for Raspberry Pi
 Health-only version - NO SENSOR DATA
 """
 
+import concurrent.futures
+import functools
+import gzip
 import json
+import logging
+import logging.handlers
+import os
+import queue
+import selectors
+import sys
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
 import uuid
 import psutil
-import subprocess
+
+try:
+    # ~10x faster than datetime.fromisoformat on the token refresh path
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = None
+
+try:
+    # C-level JSON encoder - several times faster than stdlib on a Pi
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("junctionrelay")
+
+
+def _json_bytes(obj) -> bytes:
+    """Serialize to compact JSON bytes, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+@functools.lru_cache(maxsize=256)
+def parse_iso8601(iso_str: str) -> float:
+    """Parse ISO 8601 timestamp to Unix timestamp"""
+    if not iso_str:
+        return 0
+
+    try:
+        if parse_datetime is not None:
+            return parse_datetime(iso_str).timestamp()
+
+        # Map 'Z' to an explicit UTC offset so the parsed datetime is
+        # aware - a naive .timestamp() would shift by the host's UTC
+        # offset, unlike the ciso8601 path above
+        if iso_str.endswith('Z'):
+            iso_str = iso_str[:-1] + '+00:00'
+
+        return datetime.fromisoformat(iso_str).timestamp()
+
+    except Exception as e:
+        logger.error("❌ Failed to parse ISO8601 timestamp %s: %s", iso_str, e)
+        return 0
+
+
+@functools.lru_cache(maxsize=256)
+def format_timestamp(timestamp: float) -> str:
+    """Format Unix timestamp to ISO 8601 string"""
+    if timestamp <= 0:
+        return ""
+    try:
+        # UTC, since the trailing Z says so
+        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    except:
+        return ""
 
 
 class JunctionRelay:
     def __init__(self, config_file: str = "junction_relay_config.json"):
         self.config_file = Path(config_file)
         self.cloud_base_url = "https://api.junctionrelay.com"
-        
+
+        # Endpoint URLs and static headers built once instead of
+        # re-formatting f-strings and dicts on every request
+        self._url_register = f"{self.cloud_base_url}/cloud/devices/register"
+        self._url_refresh = f"{self.cloud_base_url}/cloud/devices/refresh"
+        self._url_rotate = f"{self.cloud_base_url}/cloud/devices/refresh-rotate"
+        self._url_health = f"{self.cloud_base_url}/cloud/devices/health"
+        self._json_headers = {"Content-Type": "application/json"}
+
+        # Static skeleton of the health body - the constant keys are
+        # encoded once here instead of on every send
+        self._health_prefix = b'{"Status":"online","SensorData":'
+        self._health_samples_key = b',"Samples":'
+
+        # Verbose request/response dumps (payload echo etc.)
+        self.verbose = False
+
+
         # State variables
         self.jwt = ""
         self.refresh_token = ""
@@ -30,12 +114,21 @@ class JunctionRelay:
         self.refresh_token_expires_at = 0  # Unix timestamp
         self.last_token_refresh = 0
         self.last_report = 0
-        
+
+        # Interval gates run on the monotonic clock so NTP steps after boot
+        # can't skip or double-fire them; None means "due now"
+        self._last_report_mono = None
+        self._last_refresh_mono = None
+
+
         # Constants (matching ESP32 version)
         self.JWT_REFRESH_BUFFER = 300  # 5 minutes in seconds
+        self.JWT_STALE_WINDOW = 180  # 3 minutes - refresh in background, keep serving
         self.TOKEN_REFRESH_INTERVAL = 3600  # 1 hour in seconds
         self.REFRESH_TOKEN_ROTATION_THRESHOLD = 86400  # 24 hours in seconds
         self.HEALTH_REPORT_INTERVAL = 60  # 60 seconds
+        self.MAX_SENSOR_BACKLOG = 10_000  # Producers block when this fills
+        self.MAX_HEALTH_BATCH = 1000  # Samples per health POST
         
         # TESTING OVERRIDES - Comment out to use production values
         self.TESTING_MODE = True
@@ -44,10 +137,58 @@ class JunctionRelay:
             self.TEST_REFRESH_TOKEN_ROTATION_THRESHOLD = 60  # 1 minute before expiry (17 min trigger)
             self.TEST_JWT_LIFETIME = 6 * 60  # 6 minutes
             self.TEST_REFRESH_LIFETIME = 18 * 60  # 18 minutes
-        
+
+        # Resolved once so per-tick checks don't re-branch on TESTING_MODE
+        if self.TESTING_MODE:
+            self._refresh_interval = self.TEST_JWT_REFRESH_INTERVAL
+        else:
+            self._refresh_interval = self.TOKEN_REFRESH_INTERVAL
+
+
+        # Persistent HTTP session - keep-alive avoids a fresh TLS handshake
+        # on every health report / token refresh
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=2,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[502, 503, 504])
+        ))
+        self._auth_headers = {}
+
+        # Background token refresh - a stale (but not expired) JWT keeps
+        # serving health reports while the refresh runs off the main loop
+        self._refresh_lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One config writer at a time
+        self._refresh_in_flight = threading.Event()
+        self._force_sync_refresh = False
+        self._refresh_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="token-refresh")
+
+        # Sensor samples buffered between health reports and flushed as one
+        # batched POST - (timestamp, key, value) tuples. The bounded queue
+        # is the backpressure gate: producers block briefly when the network
+        # is down instead of growing memory without limit
+        self._sensor_q = queue.Queue(maxsize=self.MAX_SENSOR_BACKLOG)
+
+        # Admission control for outbound HTTP if health/refresh ever race
+        self._post_semaphore = threading.BoundedSemaphore(5)
+
+        # System stats - prime cpu_percent so later interval=None calls
+        # return the delta since last call without sleeping
+        psutil.cpu_percent(interval=None)
+        self._start_mono = time.monotonic()
+        self._stats_cache = (0.0, None)
+        self._thermal_fd = None  # Opened lazily, reused across reads
+
         # Background thread control
         self.running = False
         self.background_thread = None
+        self._wake_event = threading.Event()  # Set to wake the loop early
+
+        # Stdin polling for the registration token - set up lazily so the
+        # selector only exists while we're actually waiting for a token
+        self._stdin_selector = None
         
         # Initialize time (simplified for Python)
         self.initialize_time()
@@ -57,9 +198,9 @@ class JunctionRelay:
         
     def initialize_time(self):
         """Initialize time synchronization (simplified for Linux)"""
-        print("🕒 Time initialized")
+        logger.info("🕒 Time initialized")
         current_time = datetime.utcnow()
-        print(f"✅ Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        logger.info("✅ Current time: %s UTC", current_time.strftime('%Y-%m-%d %H:%M:%S'))
         
     def load_config(self):
         """Load configuration from file"""
@@ -72,70 +213,97 @@ class JunctionRelay:
                 self.refresh_token = config.get("refresh_token", "")
                 self.device_id = config.get("device_id", "")
                 
-                # Load expiry timestamps (stored as ISO strings, parsed to Unix timestamps)
+                # Prefer the raw epoch fields - no parsing at all; the ISO
+                # strings are kept for human readability and older configs
                 jwt_expiry_str = config.get("jwt_expires_at", "")
                 refresh_expiry_str = config.get("refresh_token_expires_at", "")
-                
-                self.jwt_expires_at = self.parse_iso8601(jwt_expiry_str)
-                self.refresh_token_expires_at = self.parse_iso8601(refresh_expiry_str)
+
+                self.jwt_expires_at = config.get(
+                    "jwt_expires_at_epoch", 0) or parse_iso8601(jwt_expiry_str)
+                self.refresh_token_expires_at = config.get(
+                    "refresh_token_expires_at_epoch", 0) or parse_iso8601(refresh_expiry_str)
                 self.last_token_refresh = config.get("last_token_refresh", 0)
+
+                # Map the persisted wall-clock refresh time into the
+                # monotonic domain so a restart doesn't reset the gate
+                if self.last_token_refresh > 0:
+                    elapsed = max(0.0, time.time() - self.last_token_refresh)
+                    self._last_refresh_mono = time.monotonic() - elapsed
                 
                 self.registered = bool(self.jwt)
-                
+                self._update_auth_headers()
+
                 if self.registered:
-                    print("✅ Device registered")
+                    logger.info("✅ Device registered")
                     if self.refresh_token and self.device_id:
-                        print("📱 Found stored refresh token")
-                        print(f"🆔 Device ID: {self.device_id}")
+                        logger.info("📱 Found stored refresh token")
+                        logger.info("🆔 Device ID: %s", self.device_id)
                         
                         current_time = time.time()
                         if self.refresh_token_expires_at > 0:
                             if self.refresh_token_expires_at > current_time:
                                 time_until_expiry = int(self.refresh_token_expires_at - current_time)
-                                print(f"🕒 Refresh token expires in {time_until_expiry} seconds")
+                                logger.info("🕒 Refresh token expires in %s seconds", time_until_expiry)
                             else:
-                                print("⚠️ Refresh token has expired")
+                                logger.warning("⚠️ Refresh token has expired")
                         
                         if self.jwt_expires_at > 0:
                             if self.jwt_expires_at > current_time:
                                 time_until_expiry = int(self.jwt_expires_at - current_time)
-                                print(f"🕒 JWT expires in {time_until_expiry} seconds")
+                                logger.info("🕒 JWT expires in %s seconds", time_until_expiry)
                             else:
-                                print("⚠️ JWT has expired")
+                                logger.warning("⚠️ JWT has expired")
                     else:
-                        print("ℹ️ No stored tokens found - will need fresh registration")
+                        logger.info("ℹ️ No stored tokens found - will need fresh registration")
                 else:
-                    print("⏳ Need registration token")
+                    logger.info("⏳ Need registration token")
                     
             except Exception as e:
-                print(f"❌ Error loading config: {e}")
+                logger.error("❌ Error loading config: %s", e)
                 
     def save_config(self):
         """Save configuration to file"""
         try:
-            config = {
-                "jwt": self.jwt,
-                "refresh_token": self.refresh_token,
-                "device_id": self.device_id,
-                "jwt_expires_at": self.format_timestamp(self.jwt_expires_at),
-                "refresh_token_expires_at": self.format_timestamp(self.refresh_token_expires_at),
-                "last_token_refresh": self.last_token_refresh,
-            }
-            
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-                
-            print("💾 Configuration saved")
+            # Snapshot the token fields under the refresh lock so a
+            # concurrent background refresh can't leave a half-updated
+            # JWT/expiry pair in the saved config
+            with self._refresh_lock:
+                config = {
+                    "jwt": self.jwt,
+                    "refresh_token": self.refresh_token,
+                    "device_id": self.device_id,
+                    "jwt_expires_at": format_timestamp(self.jwt_expires_at),
+                    "refresh_token_expires_at": format_timestamp(self.refresh_token_expires_at),
+                    "jwt_expires_at_epoch": self.jwt_expires_at,
+                    "refresh_token_expires_at_epoch": self.refresh_token_expires_at,
+                    "last_token_refresh": self.last_token_refresh,
+                }
+
+            # Write the whole payload to a temp file and rename it into
+            # place - one buffered write() plus an atomic replace, so a
+            # crash mid-save can't truncate the stored credentials. The
+            # save lock keeps the executor thread and the main thread from
+            # interleaving writes to the same temp file
+            payload = json.dumps(config, indent=2).encode()
+            with self._save_lock:
+                tmp = self.config_file.with_suffix('.tmp')
+                with open(tmp, 'wb', buffering=65536) as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.config_file)
+
+            logger.info("💾 Configuration saved")
             
             # Debug output
             current_time = time.time()
             if self.jwt_expires_at > current_time:
-                print(f"DEBUG: JWT expires in {int(self.jwt_expires_at - current_time)} seconds")
+                logger.debug("JWT expires in %s seconds", int(self.jwt_expires_at - current_time))
             if self.refresh_token_expires_at > current_time:
-                print(f"DEBUG: Refresh token expires in {int(self.refresh_token_expires_at - current_time)} seconds")
+                logger.debug("Refresh token expires in %s seconds", int(self.refresh_token_expires_at - current_time))
             
         except Exception as e:
-            print(f"❌ Error saving config: {e}")
+            logger.error("❌ Error saving config: %s", e)
             
     def clear_stored_tokens(self):
         """Clear stored tokens and reset registration state"""
@@ -144,43 +312,12 @@ class JunctionRelay:
         self.jwt_expires_at = 0
         self.refresh_token_expires_at = 0
         self.last_token_refresh = 0
+        self._last_refresh_mono = None
         self.jwt = ""
         self.registered = False
         self.save_config()
-        print("🗑️ Cleared stored tokens")
+        logger.info("🗑️ Cleared stored tokens")
         
-    def parse_iso8601(self, iso_str: str) -> float:
-        """Parse ISO 8601 timestamp to Unix timestamp"""
-        if not iso_str:
-            return 0
-            
-        try:
-            # Remove 'Z' and parse
-            if iso_str.endswith('Z'):
-                iso_str = iso_str[:-1]
-                
-            # Handle microseconds
-            if '.' in iso_str:
-                dt = datetime.fromisoformat(iso_str)
-            else:
-                dt = datetime.fromisoformat(iso_str)
-                
-            return dt.timestamp()
-            
-        except Exception as e:
-            print(f"❌ Failed to parse ISO8601 timestamp {iso_str}: {e}")
-            return 0
-            
-    def format_timestamp(self, timestamp: float) -> str:
-        """Format Unix timestamp to ISO 8601 string"""
-        if timestamp <= 0:
-            return ""
-        try:
-            dt = datetime.fromtimestamp(timestamp)
-            return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
-        except:
-            return ""
-            
     def update_token_expiry(self, jwt_expiry_str: str, refresh_expiry_str: str):
         """Update token expiry times from server response"""
         if self.TESTING_MODE:
@@ -192,38 +329,28 @@ class JunctionRelay:
             self.jwt_expires_at = test_jwt_expiry
             self.refresh_token_expires_at = test_refresh_expiry
             
-            print("DEBUG: Using test token lifetimes (6min JWT, 18min refresh)")
+            logger.debug("Using test token lifetimes (6min JWT, 18min refresh)")
         else:
             # Use server's actual expiry times
-            self.jwt_expires_at = self.parse_iso8601(jwt_expiry_str)
-            self.refresh_token_expires_at = self.parse_iso8601(refresh_expiry_str)
+            self.jwt_expires_at = parse_iso8601(jwt_expiry_str)
+            self.refresh_token_expires_at = parse_iso8601(refresh_expiry_str)
             
         current_time = time.time()
-        print(f"DEBUG: Updated JWT expiry to {int(self.jwt_expires_at)} (in {int(self.jwt_expires_at - current_time)} seconds)")
-        print(f"DEBUG: Updated refresh expiry to {int(self.refresh_token_expires_at)} (in {int(self.refresh_token_expires_at - current_time)} seconds)")
+        logger.debug("Updated JWT expiry to %s (in %s seconds)", int(self.jwt_expires_at), int(self.jwt_expires_at - current_time))
+        logger.debug("Updated refresh expiry to %s (in %s seconds)", int(self.refresh_token_expires_at), int(self.refresh_token_expires_at - current_time))
         
     def get_device_id(self) -> str:
         """Get unique device identifier (MAC address equivalent)"""
         if not self.device_id:
-            # Try to get MAC address, fallback to UUID
-            try:
-                # Get the first available network interface MAC
-                import psutil
-                for interface, addrs in psutil.net_if_addrs().items():
-                    if interface != 'lo':  # Skip loopback
-                        for addr in addrs:
-                            if addr.family == psutil.AF_LINK:
-                                self.device_id = addr.address.upper()
-                                break
-                        if self.device_id:
-                            break
-            except:
-                pass
-                
-            # Fallback to UUID if MAC not available
-            if not self.device_id:
-                self.device_id = str(uuid.getnode())
-                
+            # uuid.getnode reads the MAC without walking every interface;
+            # falls back to a random-but-stable node id if none is found
+            mac_hex = '%012X' % uuid.getnode()
+            self.device_id = ':'.join(
+                mac_hex[i:i + 2] for i in range(0, 12, 2))
+
+            # Persist so later process starts skip the lookup entirely
+            self.save_config()
+
         return self.device_id
         
     def set_token(self, token: str):
@@ -232,13 +359,13 @@ class JunctionRelay:
             try:
                 token_data = json.loads(token)
                 if all(key in token_data for key in ["deviceName", "token"]):
-                    print("🔑 Registration token validated")
-                    print(f"Device: {token_data['deviceName']}")
+                    logger.info("🔑 Registration token validated")
+                    logger.info("Device: %s", token_data['deviceName'])
                     
                     self.register_device(token_data)
                     
             except json.JSONDecodeError:
-                print("❌ Invalid JSON format")
+                logger.error("❌ Invalid JSON format")
                 
     def register_device(self, token_data: Dict[str, Any]):
         """Register device with the cloud service"""
@@ -251,14 +378,15 @@ class JunctionRelay:
                 "deviceName": token_data["deviceName"]
             }
             
-            print("📡 Registering device...")
+            logger.info("📡 Registering device...")
             
-            response = requests.post(
-                f"{self.cloud_base_url}/cloud/devices/register",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            with self._post_semaphore:
+                response = self._session.post(
+                    self._url_register,
+                    json=payload,
+                    headers=self._json_headers,
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -266,6 +394,7 @@ class JunctionRelay:
                 if "deviceJwt" in result:
                     self.jwt = result["deviceJwt"]
                     self.registered = True
+                    self._update_auth_headers()
                     
                     # Extract and store refresh token
                     if "refreshToken" in result:
@@ -277,18 +406,19 @@ class JunctionRelay:
                         
                         self.update_token_expiry(jwt_expiry_str, refresh_expiry_str)
                         self.last_token_refresh = time.time()
+                        self._last_refresh_mono = time.monotonic()
                         
                         self.save_config()
-                        print("✅ Device registered with refresh token!")
+                        logger.info("✅ Device registered with refresh token!")
                     else:
-                        print("✅ Device registered!")
+                        logger.info("✅ Device registered!")
                         
             else:
-                print(f"❌ Registration failed: {response.status_code}")
-                print(f"Response: {response.text}")
+                logger.error("❌ Registration failed: %s", response.status_code)
+                logger.error("Response: %s", response.text)
                 
         except Exception as e:
-            print(f"❌ Registration error: {e}")
+            logger.error("❌ Registration error: %s", e)
             
     def check_and_rotate_refresh_token(self):
         """Check if refresh token needs rotation and rotate if necessary"""
@@ -308,16 +438,16 @@ class JunctionRelay:
         
         if near_expiry:
             time_until_expiry = int(self.refresh_token_expires_at - current_time)
-            print(f"DEBUG: Current time: {int(current_time)}, Refresh expires at: {int(self.refresh_token_expires_at)}")
-            print(f"DEBUG: Time until refresh token expiry: {time_until_expiry} seconds")
-            print(f"DEBUG: Rotation threshold: {rotation_threshold} seconds")
+            logger.debug("Current time: %s, Refresh expires at: %s", int(current_time), int(self.refresh_token_expires_at))
+            logger.debug("Time until refresh token expiry: %s seconds", time_until_expiry)
+            logger.debug("Rotation threshold: %s seconds", rotation_threshold)
             
-            print("🔄 Refresh token rotation triggered - expires within threshold")
+            logger.info("🔄 Refresh token rotation triggered - expires within threshold")
             
             if self.rotate_refresh_token():
-                print("✅ Refresh token rotation successful")
+                logger.info("✅ Refresh token rotation successful")
             else:
-                print("❌ Refresh token rotation failed - triggering re-registration")
+                logger.error("❌ Refresh token rotation failed - triggering re-registration")
                 self.handle_token_refresh_failure()
                 
     def rotate_refresh_token(self) -> bool:
@@ -328,21 +458,23 @@ class JunctionRelay:
                 "DeviceId": self.device_id
             }
             
-            print("📤 Sending refresh token rotation request")
-            print(f"🔗 URL: {self.cloud_base_url}/cloud/devices/refresh-rotate")
-            print(f"📋 Payload: {json.dumps(payload)}")
-            
-            response = requests.post(
-                f"{self.cloud_base_url}/cloud/devices/refresh-rotate",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            logger.info("📤 Sending refresh token rotation request")
+            if __debug__ and self.verbose:
+                logger.debug("🔗 URL: %s", self._url_rotate)
+                logger.debug("📋 Payload: %s", json.dumps(payload))
+
+            with self._post_semaphore:
+                response = self._session.post(
+                    self._url_rotate,
+                    json=payload,
+                    headers=self._json_headers,
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 result = response.json()
-                print("✅ Refresh token rotation successful")
-                print(f"📨 Response: {response.text}")
+                logger.info("✅ Refresh token rotation successful")
+                logger.debug("📨 Response: %s", response.text)
                 
                 if result.get("success") and "token" in result and "refreshToken" in result:
                     new_jwt = result["token"]
@@ -351,72 +483,120 @@ class JunctionRelay:
                     refresh_expiry_str = result.get("refreshTokenExpiresAt", "")
                     
                     # Update tokens and expiry times
-                    self.jwt = new_jwt
-                    self.refresh_token = new_refresh_token
-                    self.update_token_expiry(jwt_expiry_str, refresh_expiry_str)
+                    with self._refresh_lock:
+                        self.jwt = new_jwt
+                        self.refresh_token = new_refresh_token
+                        self._update_auth_headers()
+                        self.update_token_expiry(jwt_expiry_str, refresh_expiry_str)
                     
                     # Save all tokens with new expiry times
                     self.save_config()
                     
                     return True
                 else:
-                    print("❌ Failed to parse rotation response or success=false")
+                    logger.error("❌ Failed to parse rotation response or success=false")
                     return False
                     
             else:
-                print(f"❌ Refresh token rotation failed with code: {response.status_code}")
-                print(f"📨 Error response: {response.text}")
+                logger.error("❌ Refresh token rotation failed with code: %s", response.status_code)
+                logger.debug("📨 Error response: %s", response.text)
                 return False
                 
         except Exception as e:
-            print(f"❌ Refresh token rotation error: {e}")
+            logger.error("❌ Refresh token rotation error: %s", e)
             return False
             
+    def _should_refresh(self, now_mono: float) -> Optional[str]:
+        """Decide whether a JWT refresh is due - returns the reason or None
+
+        The common case (inside the interval, token comfortably fresh) is a
+        single subtraction and compare, since this runs on every tick.
+        """
+        if (self._last_refresh_mono is not None
+                and now_mono - self._last_refresh_mono < self._refresh_interval):
+            return None  # Too soon to refresh again
+
+        # Interval gate passed - note when the token is also near expiry
+        # (expiry stays in the wall-clock domain; it comes from the server)
+        if (self.jwt_expires_at > 0 and
+                time.time() + self.JWT_REFRESH_BUFFER >= self.jwt_expires_at):
+            return "token near expiry"
+        return "refresh interval reached"
+
     def check_and_refresh_token(self):
         """Check if JWT token needs refresh and refresh if necessary"""
         if not self.refresh_token or not self.device_id:
             return
-            
-        current_time = time.time()
-        
-        # Check if TOKEN_REFRESH_INTERVAL has passed since last refresh attempt
-        if self.TESTING_MODE:
-            refresh_interval = self.TEST_JWT_REFRESH_INTERVAL
+
+        current_mono = time.monotonic()
+        reason = self._should_refresh(current_mono)
+        if reason is None:
+            return
+
+        logger.info("🔄 JWT token refresh triggered (%s)", reason)
+
+        self.last_token_refresh = time.time()
+        self._last_refresh_mono = current_mono
+
+        # A merely stale JWT still works - refresh it off the main loop
+        # so the health path isn't blocked on the HTTP round-trip.
+        # Only a truly expired JWT (or a prior background failure)
+        # forces the synchronous path.
+        state = self._token_state()
+        if (state != "EXPIRED" and not self._force_sync_refresh
+                and not self._refresh_in_flight.is_set()):
+            self._refresh_in_flight.set()
+            self._refresh_executor.submit(self._background_token_refresh)
         else:
-            refresh_interval = self.TOKEN_REFRESH_INTERVAL
-            
-        if current_time - self.last_token_refresh < refresh_interval:
-            return  # Too soon to refresh again
-            
-        # Also check if JWT is near expiry (refresh early if we know the expiry)
-        jwt_buffer = self.JWT_REFRESH_BUFFER
-        near_expiry = (self.jwt_expires_at > 0 and current_time + jwt_buffer >= self.jwt_expires_at)
-        interval_reached = (current_time - self.last_token_refresh >= refresh_interval)
-        
-        if interval_reached or near_expiry:
-            print("🔄 JWT token refresh triggered")
-            if interval_reached:
-                if self.TESTING_MODE:
-                    print("  📅 Reason: 5-minute test interval reached")
-                else:
-                    print("  📅 Reason: 1-hour interval reached")
-            if near_expiry:
-                print("  ⏰ Reason: Token near expiry")
-                
-            self.last_token_refresh = current_time
-            if not self.refresh_device_token():
-                # JWT refresh failed - try rotating refresh token as fallback
-                print("⚠️ JWT refresh failed, attempting refresh token rotation as fallback...")
-                if self.rotate_refresh_token():
-                    print("✅ Fallback refresh token rotation successful")
-                    # Token refresh timestamp updated in save_config
-                else:
-                    print("❌ Both JWT refresh and refresh token rotation failed")
-                    self.handle_token_refresh_failure()
-            else:
-                # Save the successful refresh
+            self._force_sync_refresh = False
+            self._refresh_token_blocking()
+
+    def _token_state(self) -> str:
+        """Classify the JWT as FRESH, STALE or EXPIRED"""
+        if self.jwt_expires_at <= 0:
+            return "FRESH"  # Unknown expiry - rely on the interval gate
+
+        current_time = time.time()
+        if current_time >= self.jwt_expires_at:
+            return "EXPIRED"
+        if current_time >= self.jwt_expires_at - self.JWT_STALE_WINDOW:
+            return "STALE"
+        return "FRESH"
+
+    def _background_token_refresh(self):
+        """Refresh the JWT off the main loop while the stale token keeps serving"""
+        try:
+            if self.refresh_device_token():
                 self.save_config()
-                
+            else:
+                # Retry synchronously on the next cycle rather than looping here
+                logger.warning("⚠️ Background JWT refresh failed - next refresh will be synchronous")
+                self._force_sync_refresh = True
+                self.last_token_refresh = 0
+                self._last_refresh_mono = None
+        except Exception as e:
+            logger.error("❌ Background token refresh error: %s", e)
+            self._force_sync_refresh = True
+            self.last_token_refresh = 0
+            self._last_refresh_mono = None
+        finally:
+            self._refresh_in_flight.clear()
+
+    def _refresh_token_blocking(self):
+        """Synchronous JWT refresh with refresh-token rotation as fallback"""
+        if not self.refresh_device_token():
+            # JWT refresh failed - try rotating refresh token as fallback
+            logger.warning("⚠️ JWT refresh failed, attempting refresh token rotation as fallback...")
+            if self.rotate_refresh_token():
+                logger.info("✅ Fallback refresh token rotation successful")
+                # Token refresh timestamp updated in save_config
+            else:
+                logger.error("❌ Both JWT refresh and refresh token rotation failed")
+                self.handle_token_refresh_failure()
+        else:
+            # Save the successful refresh
+            self.save_config()
+
     def refresh_device_token(self) -> bool:
         """Refresh the JWT token using refresh token"""
         try:
@@ -425,91 +605,181 @@ class JunctionRelay:
                 "DeviceId": self.device_id
             }
             
-            print("📤 Sending token refresh request")
-            print(f"🔗 URL: {self.cloud_base_url}/cloud/devices/refresh")
-            print(f"📋 Payload: {json.dumps(payload)}")
-            
-            response = requests.post(
-                f"{self.cloud_base_url}/cloud/devices/refresh",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            logger.info("📤 Sending token refresh request")
+            if __debug__ and self.verbose:
+                logger.debug("🔗 URL: %s", self._url_refresh)
+                logger.debug("📋 Payload: %s", json.dumps(payload))
+
+            with self._post_semaphore:
+                response = self._session.post(
+                    self._url_refresh,
+                    json=payload,
+                    headers=self._json_headers,
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 result = response.json()
-                print("✅ Token refresh successful")
-                print(f"📨 Response: {response.text}")
+                logger.info("✅ Token refresh successful")
+                logger.debug("📨 Response: %s", response.text)
                 
                 if result.get("success") and "token" in result:
                     new_jwt = result["token"]
                     jwt_expiry_str = result.get("expiresAt", "")
                     
-                    if self.TESTING_MODE:
-                        # Override server values with test JWT lifetime
-                        current_time = time.time()
-                        test_jwt_expiry = current_time + self.TEST_JWT_LIFETIME
-                        self.jwt_expires_at = test_jwt_expiry
-                        print("DEBUG: Using test JWT lifetime (6 minutes)")
-                    else:
-                        # Use server's JWT expiry time
-                        self.jwt_expires_at = self.parse_iso8601(jwt_expiry_str)
-                        
-                    # Update the JWT
-                    self.jwt = new_jwt
-                    
+                    with self._refresh_lock:
+                        if self.TESTING_MODE:
+                            # Override server values with test JWT lifetime
+                            current_time = time.time()
+                            test_jwt_expiry = current_time + self.TEST_JWT_LIFETIME
+                            self.jwt_expires_at = test_jwt_expiry
+                            logger.debug("Using test JWT lifetime (6 minutes)")
+                        else:
+                            # Use server's JWT expiry time
+                            self.jwt_expires_at = parse_iso8601(jwt_expiry_str)
+
+                        # Update the JWT
+                        self.jwt = new_jwt
+                        self._update_auth_headers()
+
                     return True
                 else:
-                    print("❌ Failed to parse token refresh response or success=false")
+                    logger.error("❌ Failed to parse token refresh response or success=false")
                     return False
                     
             elif response.status_code in [401, 403]:
                 # Unauthorized - likely expired refresh token, don't retry rotation
-                print("❌ Token refresh failed with authentication error - refresh token likely expired")
-                print(f"📨 Error response: {response.text}")
+                logger.error("❌ Token refresh failed with authentication error - refresh token likely expired")
+                logger.debug("📨 Error response: %s", response.text)
                 return False
             else:
-                print(f"❌ Token refresh failed with code: {response.status_code}")
-                print(f"📨 Error response: {response.text}")
+                logger.error("❌ Token refresh failed with code: %s", response.status_code)
+                logger.debug("📨 Error response: %s", response.text)
                 return False
                 
         except Exception as e:
-            print(f"❌ Token refresh error: {e}")
+            logger.error("❌ Token refresh error: %s", e)
             return False
             
     def handle_token_refresh_failure(self):
         """Handle token refresh failure by clearing tokens and requiring re-registration"""
-        print("⚠️ Token refresh failed - clearing stored tokens")
+        logger.warning("⚠️ Token refresh failed - clearing stored tokens")
         self.clear_stored_tokens()
-        print("🔄 Device will need to re-register")
-            
+        logger.info("🔄 Device will need to re-register")
+            
+    def _update_auth_headers(self):
+        """Rebuild the cached auth headers after a JWT change"""
+        self._auth_headers = {
+            "Authorization": f"Bearer {self.jwt}",
+            "Content-Type": "application/json"
+        }
+
+    def _read_cpu_temp(self) -> Optional[float]:
+        """Read CPU temperature in °C from sysfs - no fork/exec, fd opened once"""
+        try:
+            if self._thermal_fd is None:
+                self._thermal_fd = os.open(
+                    '/sys/class/thermal/thermal_zone0/temp', os.O_RDONLY)
+            # The zone file holds millidegrees as a plain integer; pread
+            # from offset 0 rereads it without a seek or reopen
+            return int(os.pread(self._thermal_fd, 16, 0)) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+    def get_system_stats(self) -> Dict[str, Any]:
+        """Collect system health stats - non-blocking, cached for 5 seconds"""
+        current_mono = time.monotonic()
+        cached_at, cached = self._stats_cache
+        if cached is not None and current_mono - cached_at < 5:
+            return cached
+
+        # interval=None returns the usage since the previous call instead
+        # of sleeping for a sample window inside the health path
+        memory = psutil.virtual_memory()
+        stats = {
+            "cpuPercent": psutil.cpu_percent(interval=None),
+            "freeMemory": memory.available,
+            "totalMemory": memory.total,
+            "uptime": int(current_mono - self._start_mono),
+        }
+
+        cpu_temp = self._read_cpu_temp()
+        if cpu_temp is not None:
+            stats["cpuTemp"] = cpu_temp
+
+        self._stats_cache = (current_mono, stats)
+        return stats
+
+    def add_sensor(self, key: str, value: str):
+        """Buffer a sensor sample for the next batched health report
+
+        Blocks up to a second when the backlog is full, then drops the
+        sample - bounded memory beats unbounded growth when offline.
+        """
+        # Wall-clock timestamp - samples leave the device, so monotonic
+        # time would be meaningless to the server
+        try:
+            self._sensor_q.put((time.time(), key, value), timeout=1)
+        except queue.Full:
+            logger.warning("⚠️ Sensor backlog full - dropping sample for %s", key)
+
+    def _requeue_samples(self, samples):
+        """Put a failed batch back so a transient failure doesn't drop data
+
+        Gives up on samples that no longer fit the bounded backlog.
+        """
+        for sample in samples:
+            try:
+                self._sensor_q.put_nowait(sample)
+            except queue.Full:
+                break
+
     def send_health(self):
-        """Send health report to cloud service - health only, no sensor data"""
+        """Send health report to cloud service with any buffered sensor samples"""
+        samples = []
         try:
             if not self.registered or not self.jwt:
                 return
-                
-            # Health-only payload - no sensor data
-            payload = {
-                "Status": "online",
-                "SensorData": ""
-            }
-            
-            print(f"DEBUG: HTTP payload: {json.dumps(payload)}")
-            
+
+            # Drain up to one batch worth of samples; anything beyond the
+            # cap stays queued for the next report
+            while len(samples) < self.MAX_HEALTH_BATCH:
+                try:
+                    samples.append(self._sensor_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Splice the variable parts into the pre-encoded skeleton so
+            # only the stats dict and the sample batch are serialized here
+            body = (self._health_prefix + _json_bytes(self.get_system_stats())
+                    + self._health_samples_key + _json_bytes(samples) + b'}')
+
+            logger.debug("HTTP payload: %s bytes, %s samples", len(body), len(samples))
+
+            # Snapshot the auth headers so a concurrent background refresh
+            # can't swap the JWT out from under us mid-request
+            with self._refresh_lock:
+                auth_headers = self._auth_headers
+
+            headers = auth_headers
+            if len(body) > 1024:
+                # Batched JSON compresses extremely well - fastest gzip level
+                # is plenty on a Pi
+                body = gzip.compress(body, 1)
+                headers = dict(auth_headers)
+                headers["Content-Encoding"] = "gzip"
+
             # Send request
-            response = requests.post(
-                f"{self.cloud_base_url}/cloud/devices/health",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {self.jwt}",
-                    "Content-Type": "application/json"
-                },
-                timeout=30
-            )
+            with self._post_semaphore:
+                response = self._session.post(
+                    self._url_health,
+                    data=body,
+                    headers=headers,
+                    timeout=30
+                )
             
             if response.status_code == 200:
-                print("✅ Health sent")
+                logger.info("✅ Health sent")
                 
                 # DEBUG: Print token timing info after each health report
                 current_time = time.time()
@@ -517,57 +787,135 @@ class JunctionRelay:
                 if self.jwt_expires_at > 0:
                     if self.jwt_expires_at > current_time:
                         jwt_time_left = int(self.jwt_expires_at - current_time)
-                        print(f"DEBUG: JWT time remaining: {jwt_time_left} seconds")
+                        logger.debug("JWT time remaining: %s seconds", jwt_time_left)
                     else:
-                        print("DEBUG: JWT has expired!")
+                        logger.debug("JWT has expired!")
                         
                 if self.refresh_token_expires_at > 0:
                     if self.refresh_token_expires_at > current_time:
                         refresh_time_left = int(self.refresh_token_expires_at - current_time)
-                        print(f"DEBUG: Refresh token time remaining: {refresh_time_left} seconds")
+                        logger.debug("Refresh token time remaining: %s seconds", refresh_time_left)
                     else:
-                        print("DEBUG: Refresh token has expired!")
+                        logger.debug("Refresh token has expired!")
                         
             else:
-                print(f"❌ Health failed: {response.status_code}")
-                print(f"DEBUG: Error response: {response.text}")
-                
+                logger.error("❌ Health failed: %s", response.status_code)
+                logger.debug("Error response: %s", response.text)
+                self._requeue_samples(samples)
+
         except Exception as e:
-            print(f"❌ Health send error: {e}")
+            # ConnectionError/Timeout land here - the network-down case the
+            # batch buffer exists for, so the drained samples go back too
+            logger.error("❌ Health send error: %s", e)
+            self._requeue_samples(samples)
             
     def wait_for_token(self):
-        """Wait for user to input registration token"""
-        print("📋 Paste registration token (JSON) and press Enter:")
+        """Poll stdin for the registration token without blocking the loop
+
+        Waits at most a second for input, then returns so handle() can keep
+        running - the old blocking input() stalled everything until a token
+        arrived.
+        """
+        if self._stdin_selector is None:
+            print("📋 Paste registration token (JSON) and press Enter:")
+            self._stdin_selector = selectors.DefaultSelector()
+            try:
+                self._stdin_selector.register(sys.stdin, selectors.EVENT_READ)
+            except (ValueError, OSError):
+                pass  # No usable stdin (e.g. under systemd) - nothing to poll
+
         try:
-            token = input().strip()
+            if not self._stdin_selector.get_map():
+                # Stdin unavailable (systemd gives us /dev/null) - there is
+                # no registration work and no reports to schedule, so idle
+                # here; returning immediately would tight-loop handle()
+                # because the scheduler has nothing to wait for while
+                # unregistered
+                self._wake_event.wait(timeout=1)
+                return True
+
+            if not self._stdin_selector.select(timeout=1):
+                return True  # No input yet - fall through to other work
+
+            token = sys.stdin.readline()
+            if not token:
+                # EOF - stop polling a closed stdin
+                self._stdin_selector.unregister(sys.stdin)
+                return True
+
+            token = token.strip()
             if token.startswith('{') and token.endswith('}'):
                 self.set_token(token)
-            else:
-                print("❌ Invalid JSON format")
+            elif token:
+                logger.error("❌ Invalid JSON format")
         except KeyboardInterrupt:
-            print("\n👋 Goodbye!")
+            logger.info("\n👋 Goodbye!")
             return False
         return True
         
     def handle(self):
         """Main handling method (equivalent to ESP32 handle())"""
         if not self.registered:
-            return self.wait_for_token()
-            
+            if not self.wait_for_token():
+                return False
+            if not self.registered:
+                return True  # Still waiting for a token
+            # Registration just completed - fall through so the first
+            # health report goes out on this pass
+
+
         # Check if we need to rotate refresh token
         self.check_and_rotate_refresh_token()
         
         # Check if we need to refresh the JWT token
         self.check_and_refresh_token()
         
-        # Send health report every minute
-        current_time = time.time()
-        if current_time - self.last_report > self.HEALTH_REPORT_INTERVAL:
+        # Send health report every minute (monotonic - immune to NTP steps)
+        current_mono = time.monotonic()
+        if (self._last_report_mono is None or
+                current_mono - self._last_report_mono > self.HEALTH_REPORT_INTERVAL):
             self.send_health()
-            self.last_report = current_time
+            self.last_report = time.time()
+            self._last_report_mono = current_mono
             
         return True
-        
+
+    def _seconds_until_next_event(self) -> float:
+        """Seconds until the next scheduled action needs the loop awake"""
+        if self._last_report_mono is None:
+            return 0.0  # First health report still pending
+
+        current_mono = time.monotonic()
+        waits = [self._last_report_mono + self.HEALTH_REPORT_INTERVAL - current_mono]
+
+        if self.refresh_token and self.device_id:
+            if self._last_refresh_mono is None:
+                return 0.0  # Refresh due now (e.g. after a background failure)
+
+            # The interval gate in _should_refresh is the only refresh
+            # deadline worth waking for: the near-expiry point can't fire
+            # before the gate opens, so waking on an unclamped expiry term
+            # would spin the loop with zero-length sleeps while the gate
+            # still blocks
+            waits.append(self._last_refresh_mono + self._refresh_interval - current_mono)
+
+        wait = min(waits)
+        if (wait <= 0.0 and self._should_refresh(current_mono) is None
+                and current_mono - self._last_report_mono <= self.HEALTH_REPORT_INTERVAL):
+            # Defensive floor: a zero wait with nothing actually due would
+            # otherwise busy-loop through handle()
+            return 1.0
+        return max(0.0, wait)
+
+    def wait_for_next_event(self):
+        """Sleep exactly until the next scheduled action or an external wake
+
+        Replaces the old 1-second polling sleep - ~60x fewer wakeups per
+        health cycle, which lets the Pi idle in deeper power states.
+        """
+        self._wake_event.wait(timeout=self._seconds_until_next_event())
+        self._wake_event.clear()
+
     def start_background_service(self):
         """Start background service thread"""
         if self.running:
@@ -576,14 +924,15 @@ class JunctionRelay:
         self.running = True
         self.background_thread = threading.Thread(target=self._background_loop, daemon=True)
         self.background_thread.start()
-        print("🚀 Background service started")
+        logger.info("🚀 Background service started")
         
     def stop_background_service(self):
         """Stop background service"""
         self.running = False
+        self._wake_event.set()  # Wake the loop immediately
         if self.background_thread:
             self.background_thread.join()
-        print("⏹️ Background service stopped")
+        logger.info("⏹️ Background service stopped")
         
     def _background_loop(self):
         """Background loop for continuous operation"""
@@ -591,35 +940,45 @@ class JunctionRelay:
             try:
                 if not self.handle():
                     break
-                time.sleep(1)  # Small delay to prevent busy waiting
+                self.wait_for_next_event()
             except KeyboardInterrupt:
                 break
             except Exception as e:
-                print(f"❌ Background loop error: {e}")
-                time.sleep(5)  # Wait before retrying
+                logger.error("❌ Background loop error: %s", e)
+                self._wake_event.wait(timeout=5)  # Wait before retrying
+                self._wake_event.clear()
 
 
 def main():
     """Main function for standalone operation"""
-    print("🚀 JunctionRelay Python Starting...")
+    # Console logging through a small batching buffer - records hit stdout
+    # every 16 entries, or immediately at WARNING and above, so steady-state
+    # debug chatter costs one write() per batch instead of one per line
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=16, flushLevel=logging.WARNING, target=stream_handler)
+    logging.basicConfig(level=logging.DEBUG, handlers=[buffered_handler])
+
+    logger.info("🚀 JunctionRelay Python Starting...")
     
     # Initialize JunctionRelay
     relay = JunctionRelay()
     
-    print("📊 Device ready")
+    logger.info("📊 Device ready")
     
     try:
         # Main loop
         while True:
             if not relay.handle():
                 break
-                
-            time.sleep(1)
+
+            relay.wait_for_next_event()
             
     except KeyboardInterrupt:
-        print("\n👋 Goodbye!")
+        logger.info("\n👋 Goodbye!")
     except Exception as e:
-        print(f"❌ Main loop error: {e}")
+        logger.error("❌ Main loop error: %s", e)
     finally:
         relay.stop_background_service()
 